@@ -1,69 +1,92 @@
 import psycopg2
 import pandas as pd
-import pickle
+import pyarrow.csv as pacsv
 import random
 import os
-
-# Connect to OMOP
-conn = psycopg2.connect(host="localhost", database="omop", user="omop", password="omop")
-
-# Load data
-print("Loading OMOP data...")
-person = pd.read_sql("SELECT * FROM person", conn)
-conditions = pd.read_sql("SELECT * FROM condition_occurrence", conn)
-drugs = pd.read_sql("SELECT * FROM drug_exposure", conn)
-
-# De-identify: Remove PII columns
-print("De-identifying data...")
-
-# Keep only needed columns
-person_clean = person[
-    ["person_id", "gender_concept_id", "year_of_birth", "race_concept_id"]
-].copy()
-
-conditions_clean = conditions[
-    [
-        "condition_occurrence_id",
-        "person_id",
-        "condition_concept_id",
-        "condition_start_date",
-    ]
-].copy()
-
-drugs_clean = drugs[
-    ["drug_exposure_id", "person_id", "drug_concept_id", "drug_exposure_start_date"]
-].copy()
-
-
-random.seed(42)  # Reproducible
-
-date_shift = random.randint(1, 30)
-conditions_clean["condition_start_date"] = pd.to_datetime(
-    conditions_clean["condition_start_date"]
-) + pd.Timedelta(days=date_shift)
-
-drugs_clean["drug_exposure_start_date"] = pd.to_datetime(
-    drugs_clean["drug_exposure_start_date"]
-) + pd.Timedelta(days=date_shift)
-
-print(f"Shifted dates by {date_shift} days")
-
-# Create combined dataset
-data = {"person": person_clean, "conditions": conditions_clean, "drugs": drugs_clean}
-
-# Save as RData file
-output_file = "data/sample_omop_data.rda"
-print(f"Saving to {output_file}...")
-
-
-os.makedirs("data", exist_ok=True)
-
-with open(output_file.replace(".rda", ".pkl"), "wb") as f:
-    pickle.dump(data, f)
-
-print("✓ De-identified data ready")
-print(f"  Persons: {len(person_clean)}")
-print(f"  Conditions: {len(conditions_clean)}")
-print(f"  Drugs: {len(drugs_clean)}")
-
-conn.close()
+import tempfile
+from contextlib import closing
+
+# Columns exported per OMOP table; nothing else leaves the database
+PERSON_COLUMNS = ["person_id", "gender_concept_id", "year_of_birth", "race_concept_id"]
+CONDITION_COLUMNS = [
+    "condition_occurrence_id",
+    "person_id",
+    "condition_concept_id",
+    "condition_start_date",
+]
+DRUG_COLUMNS = [
+    "drug_exposure_id",
+    "person_id",
+    "drug_concept_id",
+    "drug_exposure_start_date",
+]
+
+# Output name → (OMOP table, exported columns)
+EXTRACTS = {
+    "person": ("person", PERSON_COLUMNS),
+    "conditions": ("condition_occurrence", CONDITION_COLUMNS),
+    "drugs": ("drug_exposure", DRUG_COLUMNS),
+}
+
+# COPY output above this size is spooled to disk instead of memory
+SPOOL_MAX_BYTES = 64 * 1024 * 1024
+
+
+def copy_table(conn, table, columns):
+    """Stream selected columns out via COPY TO STDOUT and parse them with Arrow"""
+    query = f"SELECT {', '.join(columns)} FROM {table}"
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as buf:
+        with conn.cursor() as cur:
+            cur.copy_expert(f"COPY ({query}) TO STDOUT WITH CSV HEADER", buf)
+        buf.seek(0)
+        arrow_table = pacsv.read_csv(buf)
+    return arrow_table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def main():
+    """Extract, de-identify and save the OMOP sample for DataSHIELD"""
+    # Load data
+    # De-identify: only the columns needed downstream leave the database
+    print("Loading OMOP data...")
+    with closing(
+        psycopg2.connect(
+            host="localhost", database="omop", user="omop", password="omop"
+        )
+    ) as conn:
+        data = {
+            name: copy_table(conn, table, columns)
+            for name, (table, columns) in EXTRACTS.items()
+        }
+
+    # De-identify: shift dates
+    print("De-identifying data...")
+
+    random.seed(42)  # Reproducible
+
+    date_shift = random.randint(1, 30)
+    for name, column in [
+        ("conditions", "condition_start_date"),
+        ("drugs", "drug_exposure_start_date"),
+    ]:
+        data[name][column] = pd.to_datetime(data[name][column]) + pd.Timedelta(
+            days=date_shift
+        )
+
+    print(f"Shifted dates by {date_shift} days")
+
+    # Save as Parquet (zstd), readable from R via arrow::read_parquet
+    os.makedirs("data", exist_ok=True)
+
+    for name, df in data.items():
+        output_file = f"data/sample_omop_{name}.parquet"
+        print(f"Saving to {output_file}...")
+        df.to_parquet(output_file, compression="zstd", engine="pyarrow", index=False)
+
+    print("✓ De-identified data ready")
+    print(f"  Persons: {len(data['person'])}")
+    print(f"  Conditions: {len(data['conditions'])}")
+    print(f"  Drugs: {len(data['drugs'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Fused row kernels for the Synthea → OMOP mappers
+Each kernel fills all derived columns of a chunk in a single pass.
+Compiled with Numba when it is installed, plain numpy otherwise.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+try:
+    import numba
+    from numba import njit, prange
+except ImportError:  # numba is optional; the numpy fallbacks below are used
+    numba = njit = None
+    prange = range
+
+NAT = np.iinfo(np.int64).min  # int64 view of NaT
+NS_PER_DAY = 86_400 * 1_000_000_000
+
+# condition_status_concept_id
+CONDITION_ACTIVE = 4203942
+CONDITION_RESOLVED = 4230359
+# Indexed by "STOP is missing": branchless status lookup
+CONDITION_STATUS = np.array([CONDITION_RESOLVED, CONDITION_ACTIVE], dtype=np.int32)
+
+
+def datetime_ns(values: pd.Series) -> np.ndarray:
+    """datetime64 column as int64 nanoseconds since epoch (NaT → NAT)"""
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values)
+    if values.dt.tz is not None:
+        values = values.dt.tz_localize(None)
+    return values.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _condition_kernel(patient_idx, stop_ns, person_id, status):
+    for i in prange(patient_idx.shape[0]):
+        person_id[i] = patient_idx[i] + 1
+        status[i] = CONDITION_STATUS[np.int8(stop_ns[i] == NAT)]
+
+
+def _drug_kernel(patient_idx, start_ns, stop_ns, person_id, end_ns, days_supply):
+    for i in prange(patient_idx.shape[0]):
+        person_id[i] = patient_idx[i] + 1
+        end = start_ns[i] if stop_ns[i] == NAT else stop_ns[i]
+        end_ns[i] = end
+        days_supply[i] = (end - start_ns[i]) // NS_PER_DAY
+
+
+# No cache=True: this module is imported as kernels, etl_engine.kernels and
+# etl_omop_fhir.etl_engine.kernels, and a Numba cache entry written under one
+# module name fails to load under another
+if njit is not None:
+    _condition_kernel = njit(parallel=True)(_condition_kernel)
+    _drug_kernel = njit(parallel=True)(_drug_kernel)
+
+
+def warm_up() -> None:
+    """
+    Compile the kernels and start Numba's thread pool from the calling thread
+
+    Call from the main thread before running the mappers in worker threads:
+    a TBB thread pool first started from a worker thread can deadlock at
+    interpreter exit.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    condition_columns(empty, empty)
+    drug_columns(empty, empty, empty)
+
+
+def concurrent_safe() -> bool:
+    """
+    Whether the kernels may be called from several threads at once
+
+    Numba's workqueue threading layer, used when neither TBB nor OpenMP is
+    available, aborts the process on concurrent parallel launches. Only
+    valid after warm_up() has started the threading layer.
+    """
+    return njit is None or numba.threading_layer() != "workqueue"
+
+
+def condition_columns(
+    patient_idx: np.ndarray, stop_ns: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Derive person_id and condition_status_concept_id for a chunk of conditions
+
+    Args:
+        patient_idx: Row position of each patient in person order (-1 = unknown)
+        stop_ns: STOP as int64 nanoseconds (NAT = condition still active)
+
+    Returns:
+        (person_id, condition_status_concept_id)
+    """
+    if njit is None:
+        person_id = patient_idx + 1
+        status = CONDITION_STATUS[(stop_ns == NAT).view(np.int8)]
+        return person_id, status
+
+    person_id = np.empty(len(patient_idx), dtype=np.int64)
+    status = np.empty(len(patient_idx), dtype=np.int32)
+    _condition_kernel(patient_idx, stop_ns, person_id, status)
+    return person_id, status
+
+
+def drug_columns(
+    patient_idx: np.ndarray, start_ns: np.ndarray, stop_ns: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Derive person_id, exposure end and days_supply for a chunk of medications
+
+    A missing STOP ends the exposure on its START date.
+
+    Args:
+        patient_idx: Row position of each patient in person order (-1 = unknown)
+        start_ns: START as int64 nanoseconds
+        stop_ns: STOP as int64 nanoseconds (NAT = no stop date)
+
+    Returns:
+        (person_id, end_ns, days_supply); days_supply is undefined where
+        START is NAT and must be masked by the caller
+    """
+    if njit is None:
+        person_id = patient_idx + 1
+        end_ns = np.where(stop_ns == NAT, start_ns, stop_ns)
+        days_supply = ((end_ns - start_ns) // NS_PER_DAY).astype(np.int32)
+        return person_id, end_ns, days_supply
+
+    n = len(patient_idx)
+    person_id = np.empty(n, dtype=np.int64)
+    end_ns = np.empty(n, dtype=np.int64)
+    days_supply = np.empty(n, dtype=np.int32)
+    _drug_kernel(patient_idx, start_ns, stop_ns, person_id, end_ns, days_supply)
+    return person_id, end_ns, days_supply
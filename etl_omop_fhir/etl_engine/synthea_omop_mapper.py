@@ -3,32 +3,147 @@ Synthea to OMOP CDM v5.4 Mapping Logic
 Based on OHDSI ETL-Synthea reference implementation
 """
 
+import numpy as np
 import pandas as pd
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from sqlalchemy.engine import Connection
+
+try:
+    import duckdb
+except ImportError:  # duckdb is optional; map_person falls back to pandas
+    duckdb = None
 
 try:
     from .base_etl import OMOPETLBase
+    from .kernels import (
+        NAT,
+        concurrent_safe,
+        condition_columns,
+        datetime_ns,
+        drug_columns,
+        warm_up,
+    )
 except ImportError:
     from base_etl import OMOPETLBase
+    from kernels import (
+        NAT,
+        concurrent_safe,
+        condition_columns,
+        datetime_ns,
+        drug_columns,
+        warm_up,
+    )
 
 logger = logging.getLogger(__name__)
 
+# ETL settings shipped next to this module
+CONFIG_PATH = Path(__file__).parent / "config.yaml"
+
+# OMOP tables written by run_etl: person tables first, then the event tables,
+# which only depend on person and are loaded concurrently
+PERSON_TABLES = ["person", "observation_period"]
+EVENT_TABLES = ["condition_occurrence", "drug_exposure"]
+
+# Synthea CSV columns each mapper reads; the rest are never parsed
+PATIENT_COLUMNS = ["Id", "BIRTHDATE", "DEATHDATE", "GENDER", "RACE", "ETHNICITY"]
+CONDITION_COLUMNS = ["START", "STOP", "PATIENT", "CODE"]
+MEDICATION_COLUMNS = ["START", "STOP", "PATIENT", "CODE", "REASONCODE"]
+
+# Read-time typing for patients.csv, so dates are parsed by the CSV reader
+PATIENT_DTYPES = {
+    "Id": "string",
+    "GENDER": "category",
+    "RACE": "category",
+    "ETHNICITY": "category",
+}
+PATIENT_DATES = ["BIRTHDATE", "DEATHDATE"]
+EVENT_DATES = ["START", "STOP"]
+# Optional dates: malformed values are read as missing (NaT)
+COERCE_DATES = ["DEATHDATE", "STOP"]
+# Few distinct patients per chunk: UUIDs are hashed once per category
+EVENT_DTYPES = {"PATIENT": "category"}
+
+# OMOP concept_ids are 32-bit; int32 constants keep their columns int32 too
+NO_CONCEPT = np.int32(0)
+
+# Source value → concept_id (simplified - in production use vocab mappings)
+GENDER_CONCEPTS = {"F": 8532, "M": 8507, "female": 8532, "male": 8507}
+RACE_CONCEPTS = {"white": 8527, "black": 8516, "asian": 8515, "other": 8522}
+ETHNICITY_CONCEPTS = {"hispanic": 38003563, "nonhispanic": 38003564}
+
+
+def _concept_lookup(values: pd.Series, concepts: Dict[str, int]) -> np.ndarray:
+    """Map source values to concept_ids in one vectorized gather (0 = unmapped)"""
+    codes = pd.Categorical(values, categories=list(concepts)).codes
+    lookup = np.fromiter(concepts.values(), dtype=np.int32, count=len(concepts))
+    return np.where(codes >= 0, lookup[codes], 0)
+
+
+def _sql_concept_case(column: str, concepts: Dict[str, int]) -> str:
+    """SQL CASE mapping a source column to concept_ids (0 = unmapped)"""
+    whens = " ".join(
+        f"WHEN '{value}' THEN {concept}" for value, concept in concepts.items()
+    )
+    return f"CASE {column} {whens} ELSE 0 END"
+
+
+# patients.csv → person columns in DuckDB; person_id is assigned afterwards
+PERSON_SQL = f"""
+    SELECT
+        {_sql_concept_case("GENDER", GENDER_CONCEPTS)} AS gender_concept_id,
+        year(BIRTHDATE)::SMALLINT AS year_of_birth,
+        month(BIRTHDATE)::TINYINT AS month_of_birth,
+        day(BIRTHDATE)::TINYINT AS day_of_birth,
+        BIRTHDATE::TIMESTAMP AS birth_datetime,
+        {_sql_concept_case("RACE", RACE_CONCEPTS)} AS race_concept_id,
+        {_sql_concept_case("ETHNICITY", ETHNICITY_CONCEPTS)} AS ethnicity_concept_id,
+        NULL::INTEGER AS location_id,
+        NULL::INTEGER AS provider_id,
+        NULL::INTEGER AS care_site_id,
+        Id AS person_source_value,
+        GENDER AS gender_source_value,
+        RACE AS race_source_value,
+        ETHNICITY AS ethnicity_source_value,
+        0 AS gender_source_concept_id,
+        0 AS race_source_concept_id,
+        0 AS ethnicity_source_concept_id,
+        TRY_CAST(DEATHDATE AS DATE)::TIMESTAMP AS DEATHDATE
+    FROM read_csv(
+        $path,
+        header = true,
+        types = {{'Id': 'VARCHAR', 'BIRTHDATE': 'DATE', 'DEATHDATE': 'VARCHAR',
+                  'GENDER': 'VARCHAR', 'RACE': 'VARCHAR', 'ETHNICITY': 'VARCHAR'}}
+    )
+"""
+
 
 class SyntheaOMOPMapper(OMOPETLBase):
     """Maps Synthea CSV data to OMOP CDM tables"""
 
-    def __init__(self, db_uri: str, synthea_csv_dir: Path):
+    def __init__(
+        self,
+        db_uri: str,
+        synthea_csv_dir: Path,
+        config_path: Optional[Path] = CONFIG_PATH,
+    ):
         """
         Initialize mapper
 
         Args:
             db_uri: Database connection string
             synthea_csv_dir: Directory containing Synthea CSV files
+            config_path: YAML configuration file (None: built-in defaults)
         """
-        super().__init__(db_uri)
+        super().__init__(db_uri, config_path)
         self.synthea_dir = synthea_csv_dir
-        self.person_id_map = {}  # Synthea UUID → OMOP person_id
+        # Synthea UUIDs in person_id order (person_id = position + 1)
+        self.synthea_ids = pd.Index([], dtype=object)
+        # patients.csv parsed by map_person, reused by map_observation_period
+        self._patients: Optional[pd.DataFrame] = None
 
     def run_etl(self) -> None:
         """Execute complete ETL pipeline"""
@@ -36,215 +151,339 @@ class SyntheaOMOPMapper(OMOPETLBase):
         logger.info("Starting Synthea → OMOP ETL")
         logger.info("=" * 60)
 
-        # ETL Pipeline Steps
-        self.map_person()
-        self.map_observation_period()
-        self.map_condition_occurrence()
-        self.map_drug_exposure()
-        # self.map_measurement()  # If you have labs/vitals
-        # self.map_procedure_occurrence()  # If you have procedures
+        # ETL Pipeline Steps (indexes rebuilt at the end of each transaction)
+        with self.bulk_load(PERSON_TABLES) as conn:
+            self.map_person(conn)
+            self.map_observation_period(conn)
+
+        # Event tables only read synthea_ids: overlap their CSV reads and COPYs,
+        # each in a transaction of its own on a separate connection
+        event_mappers = [self.map_condition_occurrence, self.map_drug_exposure]
+        # self.map_measurement  # If you have labs/vitals
+        # self.map_procedure_occurrence  # If you have procedures
+        warm_up()  # start Numba threads here, not in a worker thread
+        workers = len(event_mappers)
+        if not concurrent_safe():
+            logger.info(
+                "Numba workqueue threading layer: loading event tables serially"
+            )
+            workers = 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._load_table, table, mapper)
+                for table, mapper in zip(EVENT_TABLES, event_mappers)
+            ]
+            for future in futures:
+                future.result()
 
         logger.info("=" * 60)
         logger.info("✓ ETL Complete")
         logger.info("=" * 60)
 
-    def map_person(self) -> None:
+    def _load_table(self, table: str, mapper: Callable[[Connection], None]) -> None:
+        """Run one mapper in a bulk_load transaction of its own"""
+        with self.bulk_load([table]) as conn:
+            mapper(conn)
+
+    def patient_positions(self, patient_ids: pd.Series) -> np.ndarray:
+        """Position of Synthea patient UUIDs in person order (-1 if unknown)"""
+        if isinstance(patient_ids.dtype, pd.CategoricalDtype):
+            # Look up each distinct UUID once, then gather by category code
+            positions = self.synthea_ids.get_indexer(patient_ids.cat.categories)
+            codes = patient_ids.cat.codes.to_numpy()
+            positions = np.where(codes >= 0, positions[codes], -1)
+        else:
+            positions = self.synthea_ids.get_indexer(patient_ids)
+
+        # These rows get person_id 0, which fails bulk_load's foreign key check
+        unmatched = np.count_nonzero(positions < 0)
+        if unmatched:
+            logger.warning(f"  ⚠ {unmatched} rows reference unknown patients")
+        return positions
+
+    def lookup_person_ids(self, patient_ids: pd.Series) -> np.ndarray:
+        """Translate Synthea patient UUIDs to OMOP person_ids (0 if unknown)"""
+        # Unknown UUIDs are at position -1, which lands on 0
+        return self.patient_positions(patient_ids) + 1
+
+    def map_person(self, conn: Optional[Connection] = None) -> None:
         """Map Synthea patients.csv → OMOP person table"""
         logger.info("\n[1/4] Mapping PERSON...")
 
-        # Load Synthea patients
-        patients = self.read_csv_to_dataframe(self.synthea_dir / "patients.csv")
+        if duckdb is not None:
+            omop_person = self._transform_person_duckdb()
+        else:
+            # Load Synthea patients
+            patients = self.read_csv_to_dataframe(
+                self.synthea_dir / "patients.csv",
+                usecols=PATIENT_COLUMNS,
+                dtype=PATIENT_DTYPES,
+                parse_dates=PATIENT_DATES,
+                coerce_dates=COERCE_DATES,
+            )
+            omop_person = self._transform_person(patients)
+
+        # Insert into database
+        self.bulk_insert("person", omop_person, conn=conn)
+        logger.info(f"  ✓ Mapped {len(omop_person)} persons")
 
-        # Transform to OMOP person
-        omop_person = pd.DataFrame()
+    def _transform_person(self, patients: pd.DataFrame) -> pd.DataFrame:
+        """Map parsed Synthea patients to OMOP person rows"""
+        cols = {}
 
         # Generate sequential person_ids
-        omop_person["person_id"] = range(1, len(patients) + 1)
+        cols["person_id"] = self._seq_id(len(patients))
 
         # Store mapping for later use
-        for synthea_id, omop_id in zip(patients["Id"], omop_person["person_id"]):
-            self.person_id_map[synthea_id] = omop_id
+        self.synthea_ids = pd.Index(patients["Id"])
+        self._patients = patients
 
         # Gender mapping (OMOP concepts: 8507=Female, 8532=Male)
-        omop_person["gender_concept_id"] = (
-            patients["GENDER"]
-            .map({"F": 8532, "M": 8507, "female": 8532, "male": 8507})
-            .fillna(0)
-        )
+        cols["gender_concept_id"] = _concept_lookup(patients["GENDER"], GENDER_CONCEPTS)
 
         # Birth date components
-        patients["BIRTHDATE"] = pd.to_datetime(patients["BIRTHDATE"])
-        omop_person["year_of_birth"] = patients["BIRTHDATE"].dt.year
-        omop_person["month_of_birth"] = patients["BIRTHDATE"].dt.month
-        omop_person["day_of_birth"] = patients["BIRTHDATE"].dt.day
-        omop_person["birth_datetime"] = patients["BIRTHDATE"]
+        cols["year_of_birth"] = patients["BIRTHDATE"].dt.year.astype("Int16")
+        cols["month_of_birth"] = patients["BIRTHDATE"].dt.month.astype("Int8")
+        cols["day_of_birth"] = patients["BIRTHDATE"].dt.day.astype("Int8")
+        cols["birth_datetime"] = patients["BIRTHDATE"]
 
         # Race/Ethnicity (simplified - in production use vocab mappings)
-        omop_person["race_concept_id"] = (
-            patients["RACE"]
-            .map({"white": 8527, "black": 8516, "asian": 8515, "other": 8522})
-            .fillna(0)
-        )
+        cols["race_concept_id"] = _concept_lookup(patients["RACE"], RACE_CONCEPTS)
 
-        omop_person["ethnicity_concept_id"] = (
-            patients["ETHNICITY"]
-            .map({"hispanic": 38003563, "nonhispanic": 38003564})
-            .fillna(0)
+        cols["ethnicity_concept_id"] = _concept_lookup(
+            patients["ETHNICITY"], ETHNICITY_CONCEPTS
         )
 
         # Location/Provider (set to defaults for now)
-        omop_person["location_id"] = None
-        omop_person["provider_id"] = None
-        omop_person["care_site_id"] = None
+        cols["location_id"] = None
+        cols["provider_id"] = None
+        cols["care_site_id"] = None
 
         # Source values (for traceability)
-        omop_person["person_source_value"] = patients["Id"]
-        omop_person["gender_source_value"] = patients["GENDER"]
-        omop_person["race_source_value"] = patients["RACE"]
-        omop_person["ethnicity_source_value"] = patients["ETHNICITY"]
+        cols["person_source_value"] = patients["Id"]
+        cols["gender_source_value"] = patients["GENDER"]
+        cols["race_source_value"] = patients["RACE"]
+        cols["ethnicity_source_value"] = patients["ETHNICITY"]
 
         # Concept source values (for foreign keys)
-        omop_person["gender_source_concept_id"] = 0
-        omop_person["race_source_concept_id"] = 0
-        omop_person["ethnicity_source_concept_id"] = 0
-
-        # Insert into database
-        self.bulk_insert("person", omop_person)
-        logger.info(f"  ✓ Mapped {len(omop_person)} persons")
+        cols["gender_source_concept_id"] = NO_CONCEPT
+        cols["race_source_concept_id"] = NO_CONCEPT
+        cols["ethnicity_source_concept_id"] = NO_CONCEPT
+
+        return pd.DataFrame(cols, copy=False)
+
+    def _transform_person_duckdb(self) -> pd.DataFrame:
+        """Read and map patients.csv → OMOP person rows in one DuckDB query"""
+        csv_path = self.synthea_dir / "patients.csv"
+        logger.info(f"Loading CSV with DuckDB: {csv_path.name}")
+        with duckdb.connect() as con:
+            person = con.execute(PERSON_SQL, {"path": str(csv_path)}).df()
+
+        person.insert(0, "person_id", self._seq_id(len(person)))
+
+        # Store mapping and dates for map_observation_period
+        self.synthea_ids = pd.Index(person["person_source_value"])
+        self._patients = pd.DataFrame(
+            {
+                "Id": person["person_source_value"],
+                "BIRTHDATE": person["birth_datetime"],
+                "DEATHDATE": person.pop("DEATHDATE"),
+            },
+            copy=False,
+        )
+        return person
 
-    def map_observation_period(self) -> None:
+    def map_observation_period(self, conn: Optional[Connection] = None) -> None:
         """Create observation_period for each person"""
         logger.info("\n[2/4] Mapping OBSERVATION_PERIOD...")
 
-        patients = self.read_csv_to_dataframe(self.synthea_dir / "patients.csv")
-
-        obs_period = pd.DataFrame()
-        obs_period["observation_period_id"] = range(1, len(patients) + 1)
+        patients = self._patients
+        if patients is None:
+            patients = self.read_csv_to_dataframe(
+                self.synthea_dir / "patients.csv",
+                usecols=PATIENT_COLUMNS,
+                dtype=PATIENT_DTYPES,
+                parse_dates=PATIENT_DATES,
+                coerce_dates=COERCE_DATES,
+            )
+        # Only needed until the observation periods are built
+        self._patients = None
+
+        cols = {}
+        cols["observation_period_id"] = self._seq_id(len(patients))
 
         # Map to OMOP person_id
-        obs_period["person_id"] = patients["Id"].map(self.person_id_map)
+        cols["person_id"] = self.lookup_person_ids(patients["Id"])
 
         # Observation period = birth date to death date (or now)
-        patients["BIRTHDATE"] = pd.to_datetime(patients["BIRTHDATE"])
-        obs_period["observation_period_start_date"] = patients["BIRTHDATE"]
+        cols["observation_period_start_date"] = patients["BIRTHDATE"]
 
         # If death date exists, use it; otherwise use current date
-        patients["DEATHDATE"] = pd.to_datetime(patients["DEATHDATE"], errors="coerce")
-        obs_period["observation_period_end_date"] = patients["DEATHDATE"].fillna(
+        cols["observation_period_end_date"] = patients["DEATHDATE"].fillna(
             pd.Timestamp.now()
         )
 
         # Period type concept (44814724 = "Period covering healthcare encounters")
-        obs_period["period_type_concept_id"] = 44814724
+        cols["period_type_concept_id"] = np.int32(44814724)
+
+        obs_period = pd.DataFrame(cols, copy=False)
 
-        self.bulk_insert("observation_period", obs_period)
+        self.bulk_insert("observation_period", obs_period, conn=conn)
         logger.info(f"  ✓ Created {len(obs_period)} observation periods")
 
-    def map_condition_occurrence(self) -> None:
+    def map_condition_occurrence(self, conn: Optional[Connection] = None) -> None:
         """Map Synthea conditions.csv → OMOP condition_occurrence"""
         logger.info("\n[3/4] Mapping CONDITION_OCCURRENCE...")
 
-        conditions = self.read_csv_to_dataframe(self.synthea_dir / "conditions.csv")
+        chunks = self.read_csv_chunks(
+            self.synthea_dir / "conditions.csv",
+            usecols=CONDITION_COLUMNS,
+            dtype=EVENT_DTYPES,
+            parse_dates=EVENT_DATES,
+            coerce_dates=COERCE_DATES,
+        )
+        count = self.copy_frames(
+            "condition_occurrence", self._condition_frames(chunks), conn=conn
+        )
 
-        if len(conditions) == 0:
+        if count == 0:
             logger.warning("  ⚠ No conditions found in CSV")
             return
 
-        omop_cond = pd.DataFrame()
-        omop_cond["condition_occurrence_id"] = range(1, len(conditions) + 1)
-
-        # Map patient IDs
-        omop_cond["person_id"] = conditions["PATIENT"].map(self.person_id_map)
+        logger.info(f"  ✓ Mapped {count} conditions")
+
+    def _condition_frames(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        """Transform Synthea conditions chunk by chunk into condition_occurrence"""
+        next_id = 1
+        for conditions in chunks:
+            if conditions.empty:
+                continue
+            yield self._transform_conditions(conditions, next_id)
+            next_id += len(conditions)
+
+    def _transform_conditions(
+        self, conditions: pd.DataFrame, first_id: int
+    ) -> pd.DataFrame:
+        """Map one chunk of Synthea conditions to OMOP condition_occurrence rows"""
+        cols = {}
+        cols["condition_occurrence_id"] = self._seq_id(len(conditions), start=first_id)
+
+        # Each timestamp column is materialized once, as int64 ns
+        start_ns = datetime_ns(conditions["START"])
+        stop_ns = datetime_ns(conditions["STOP"])
+
+        # Map patient IDs and derive status in one fused pass
+        person_id, status = condition_columns(
+            self.patient_positions(conditions["PATIENT"]), stop_ns
+        )
+        cols["person_id"] = person_id
 
         # TODO: Map SNOMED codes to OMOP concept_ids
         # For now, use source code as-is (in production, use CONCEPT table)
-        omop_cond["condition_concept_id"] = 0  # Placeholder
-        omop_cond["condition_source_value"] = conditions["CODE"]
-        omop_cond["condition_source_concept_id"] = 0
+        cols["condition_concept_id"] = NO_CONCEPT  # Placeholder
+        cols["condition_source_value"] = conditions["CODE"]
+        cols["condition_source_concept_id"] = NO_CONCEPT
 
-        # Dates
-        conditions["START"] = pd.to_datetime(conditions["START"])
-        omop_cond["condition_start_date"] = conditions["START"]
-        omop_cond["condition_start_datetime"] = conditions["START"]
+        # Dates (date and datetime columns share one array)
+        cols["condition_start_date"] = start_ns.view("datetime64[ns]")
+        cols["condition_start_datetime"] = cols["condition_start_date"]
 
         # End date (if available)
-        conditions["STOP"] = pd.to_datetime(conditions["STOP"], errors="coerce")
-        omop_cond["condition_end_date"] = conditions["STOP"]
-        omop_cond["condition_end_datetime"] = conditions["STOP"]
+        cols["condition_end_date"] = stop_ns.view("datetime64[ns]")
+        cols["condition_end_datetime"] = cols["condition_end_date"]
 
         # Type concept (32020 = "EHR")
-        omop_cond["condition_type_concept_id"] = 32020
+        cols["condition_type_concept_id"] = np.int32(32020)
 
         # Status (active = still present)
-        omop_cond["condition_status_concept_id"] = (
-            conditions["STOP"]
-            .isna()
-            .map({True: 4203942, False: 4230359})  # Active  # Resolved
-        )
+        cols["condition_status_concept_id"] = status
 
         # Optional fields (set to NULL for mini-project)
-        omop_cond["condition_status_source_value"] = None
-        omop_cond["stop_reason"] = None
-        omop_cond["provider_id"] = None
-        omop_cond["visit_occurrence_id"] = None
-        omop_cond["visit_detail_id"] = None
+        cols["condition_status_source_value"] = None
+        cols["stop_reason"] = None
+        cols["provider_id"] = None
+        cols["visit_occurrence_id"] = None
+        cols["visit_detail_id"] = None
 
-        self.bulk_insert("condition_occurrence", omop_cond)
-        logger.info(f"  ✓ Mapped {len(omop_cond)} conditions")
+        return pd.DataFrame(cols, copy=False)
 
-    def map_drug_exposure(self) -> None:
+    def map_drug_exposure(self, conn: Optional[Connection] = None) -> None:
         """Map Synthea medications.csv → OMOP drug_exposure"""
         logger.info("\n[4/4] Mapping DRUG_EXPOSURE...")
 
-        meds = self.read_csv_to_dataframe(self.synthea_dir / "medications.csv")
+        chunks = self.read_csv_chunks(
+            self.synthea_dir / "medications.csv",
+            usecols=MEDICATION_COLUMNS,
+            dtype=EVENT_DTYPES,
+            parse_dates=EVENT_DATES,
+            coerce_dates=COERCE_DATES,
+        )
+        count = self.copy_frames("drug_exposure", self._drug_frames(chunks), conn=conn)
 
-        if len(meds) == 0:
+        if count == 0:
             logger.warning("  ⚠ No medications found in CSV")
             return
 
-        omop_drug = pd.DataFrame()
-        omop_drug["drug_exposure_id"] = range(1, len(meds) + 1)
-
-        # Map patient IDs
-        omop_drug["person_id"] = meds["PATIENT"].map(self.person_id_map)
+        logger.info(f"  ✓ Mapped {count} drug exposures")
+
+    def _drug_frames(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Transform Synthea medications chunk by chunk into drug_exposure"""
+        next_id = 1
+        for meds in chunks:
+            if meds.empty:
+                continue
+            yield self._transform_drugs(meds, next_id)
+            next_id += len(meds)
+
+    def _transform_drugs(self, meds: pd.DataFrame, first_id: int) -> pd.DataFrame:
+        """Map one chunk of Synthea medications to OMOP drug_exposure rows"""
+        cols = {}
+        cols["drug_exposure_id"] = self._seq_id(len(meds), start=first_id)
+
+        # Each timestamp column is materialized once, as int64 ns
+        start_ns = datetime_ns(meds["START"])
+
+        # Map patient IDs and derive end date / days supply in one fused pass
+        person_id, end_ns, days_supply = drug_columns(
+            self.patient_positions(meds["PATIENT"]),
+            start_ns,
+            datetime_ns(meds["STOP"]),
+        )
+        cols["person_id"] = person_id
 
         # Drug concept (placeholder - in production, map RxNorm codes)
-        omop_drug["drug_concept_id"] = 0
-        omop_drug["drug_source_value"] = meds["CODE"]
-        omop_drug["drug_source_concept_id"] = 0
-
-        # Dates
-        meds["START"] = pd.to_datetime(meds["START"])
-        omop_drug["drug_exposure_start_date"] = meds["START"]
-        omop_drug["drug_exposure_start_datetime"] = meds["START"]
-
-        meds["STOP"] = pd.to_datetime(meds["STOP"], errors="coerce")
-        omop_drug["drug_exposure_end_date"] = meds["STOP"].fillna(
-            meds["START"]  # If no stop date, assume same as start
-        )
-        omop_drug["drug_exposure_end_datetime"] = omop_drug["drug_exposure_end_date"]
+        cols["drug_concept_id"] = NO_CONCEPT
+        cols["drug_source_value"] = meds["CODE"]
+        cols["drug_source_concept_id"] = NO_CONCEPT
+
+        # Dates (date and datetime columns share one array)
+        cols["drug_exposure_start_date"] = start_ns.view("datetime64[ns]")
+        cols["drug_exposure_start_datetime"] = cols["drug_exposure_start_date"]
+
+        # If no stop date, assume same as start
+        cols["drug_exposure_end_date"] = end_ns.view("datetime64[ns]")
+        cols["drug_exposure_end_datetime"] = cols["drug_exposure_end_date"]
 
         # Type concept (38000177 = "Prescription written")
-        omop_drug["drug_type_concept_id"] = 38000177
+        cols["drug_type_concept_id"] = np.int32(38000177)
 
         # Optional fields
-        omop_drug["stop_reason"] = meds["REASONCODE"]
-        omop_drug["refills"] = None
-        omop_drug["quantity"] = None
-        omop_drug["days_supply"] = (
-            omop_drug["drug_exposure_end_date"] - omop_drug["drug_exposure_start_date"]
-        ).dt.days
-        omop_drug["sig"] = None
-        omop_drug["route_concept_id"] = 0
-        omop_drug["lot_number"] = None
-        omop_drug["provider_id"] = None
-        omop_drug["visit_occurrence_id"] = None
-        omop_drug["visit_detail_id"] = None
-        omop_drug["route_source_value"] = None
-        omop_drug["dose_unit_source_value"] = None
-
-        self.bulk_insert("drug_exposure", omop_drug)
-        logger.info(f"  ✓ Mapped {len(omop_drug)} drug exposures")
+        cols["stop_reason"] = meds["REASONCODE"]
+        cols["refills"] = None
+        cols["quantity"] = None
+        cols["days_supply"] = pd.arrays.IntegerArray(days_supply, start_ns == NAT)
+        cols["sig"] = None
+        cols["route_concept_id"] = NO_CONCEPT
+        cols["lot_number"] = None
+        cols["provider_id"] = None
+        cols["visit_occurrence_id"] = None
+        cols["visit_detail_id"] = None
+        cols["route_source_value"] = None
+        cols["dose_unit_source_value"] = None
+
+        return pd.DataFrame(cols, copy=False)
 
 
 def main():
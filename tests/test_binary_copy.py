@@ -0,0 +1,233 @@
+"""
+Tests for the PostgreSQL binary COPY encoder
+
+Unit tests decode the tuple bytes directly; the round-trip test at the end
+loads them into a real server when OMOP_TEST_DB_URI is set.
+"""
+
+import io
+import os
+import struct
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl_omop_fhir.etl_engine import binary_copy
+
+
+def decode_fields(data: bytes):
+    """Split COPY BINARY tuple data into rows of raw field bytes (None = NULL)"""
+    rows, pos = [], 0
+    while pos < len(data):
+        (n_fields,) = struct.unpack_from(">h", data, pos)
+        pos += 2
+        row = []
+        for _ in range(n_fields):
+            (size,) = struct.unpack_from(">i", data, pos)
+            pos += 4
+            if size < 0:
+                row.append(None)
+            else:
+                row.append(data[pos : pos + size])
+                pos += size
+        rows.append(row)
+    return rows
+
+
+def encode_column(values, pg_type, dtype=None):
+    """Encode a single column and return its raw field bytes per row"""
+    df = pd.DataFrame({"col": pd.Series(values, dtype=dtype)})
+    return [row[0] for row in decode_fields(binary_copy.encode_rows(df, [pg_type]))]
+
+
+@pytest.mark.parametrize(
+    "pg_type, fmt",
+    [("smallint", ">h"), ("integer", ">i"), ("bigint", ">q")],
+)
+def test_integer_round_trip(pg_type, fmt):
+    bits = struct.calcsize(fmt) * 8
+    values = [0, -1, 2 ** (bits - 1) - 1, -(2 ** (bits - 1)), None]
+    fields = encode_column(values, pg_type, dtype="Int64")
+    assert fields[-1] is None
+    assert [struct.unpack(fmt, field)[0] for field in fields[:-1]] == values[:-1]
+
+
+@pytest.mark.parametrize("pg_type, bits", [("smallint", 16), ("integer", 32)])
+def test_integer_out_of_range_raises(pg_type, bits):
+    with pytest.raises(ValueError, match="out of range"):
+        encode_column([2 ** (bits - 1)], pg_type, dtype="int64")
+    with pytest.raises(ValueError, match="out of range"):
+        encode_column([-(2 ** (bits - 1)) - 1], pg_type, dtype="int64")
+
+
+def test_integer_rejects_fractional_floats():
+    with pytest.raises(ValueError, match="non-integer"):
+        encode_column([1.5], "integer", dtype="float64")
+    fields = encode_column([2.0, np.nan], "integer", dtype="float64")
+    assert fields == [struct.pack(">i", 2), None]
+
+
+def test_float_round_trip():
+    fields = encode_column([1.5, -2.25, None], "double precision", dtype="float64")
+    assert [struct.unpack(">d", f)[0] for f in fields[:2]] == [1.5, -2.25]
+    assert fields[2] is None
+    with pytest.raises(ValueError, match="out of range"):
+        encode_column([1e300], "real", dtype="float64")
+
+
+def test_boolean_round_trip():
+    fields = encode_column([True, False, None], "boolean", dtype="boolean")
+    assert fields == [b"\x01", b"\x00", None]
+
+
+def test_date_round_trip():
+    values = pd.to_datetime(["2000-01-01", "1999-12-31", "2024-02-29", None])
+    fields = encode_column(values, "date")
+    days = [struct.unpack(">i", field)[0] for field in fields[:3]]
+    assert days == [0, -1, (date(2024, 2, 29) - date(2000, 1, 1)).days]
+    assert fields[3] is None
+
+
+def test_timestamp_round_trip():
+    values = pd.to_datetime(
+        ["2000-01-01 00:00:01.000002", "1970-01-01 00:00:00.000000", None]
+    )
+    fields = encode_column(values, "timestamp without time zone")
+    micros = [struct.unpack(">q", field)[0] for field in fields[:2]]
+    assert micros == [1_000_002, -binary_copy.PG_EPOCH_MICROS]
+    assert fields[2] is None
+
+
+def test_timestamptz_is_sent_as_utc():
+    values = pd.Series(pd.to_datetime(["2000-01-01 02:00"])).dt.tz_localize(
+        "Europe/Berlin"
+    )
+    (field,) = encode_column(values, "timestamp with time zone")
+    assert struct.unpack(">q", field)[0] == 3600 * 1_000_000
+
+
+def test_text_round_trip():
+    fields = encode_column(["héllo", "", None], "text", dtype=object)
+    assert fields == ["héllo".encode(), b"", None]
+
+
+def test_text_from_nullable_integers_has_no_float_suffix():
+    fields = encode_column([123, None], "character varying", dtype="Int64")
+    assert fields == [b"123", None]
+
+
+def test_text_from_whole_number_floats_has_no_float_suffix():
+    fields = encode_column([32760266.0, np.nan], "text", dtype="float64")
+    assert fields == [b"32760266", None]
+    fields = encode_column([1.5, 2.0], "text", dtype="float64")
+    assert fields == [b"1.5", b"2.0"]
+
+
+NUMERICS = [
+    "0",
+    "0.5",
+    "123.45",
+    "-0.00001",
+    "1E+20",
+    "12345678.9",
+    "-0.0001",
+    "10000",
+    "NaN",
+    "Infinity",
+    "-Infinity",
+]
+
+
+@pytest.mark.parametrize("value", NUMERICS)
+def test_numeric_matches_psycopg_dumper(value):
+    numeric = pytest.importorskip("psycopg.types.numeric")
+    expected = numeric.DecimalBinaryDumper(Decimal).dump(Decimal(value))
+    assert binary_copy._numeric_bytes(Decimal(value)) == bytes(expected)
+
+
+def test_numeric_special_values():
+    def sign(value):
+        return struct.unpack_from(">hhH", binary_copy._numeric_bytes(value))[2]
+
+    assert sign(Decimal("NaN")) == binary_copy.NUMERIC_NAN
+    assert sign(float("inf")) == binary_copy.NUMERIC_PINF
+    assert sign(float("-inf")) == binary_copy.NUMERIC_NINF
+    assert encode_column([None], "numeric", dtype=object) == [None]
+
+
+def test_rows_hold_field_count_and_all_columns():
+    df = pd.DataFrame({"a": pd.array([1, None], dtype="Int64"), "b": ["x", "yz"]})
+    rows = decode_fields(binary_copy.encode_rows(df, ["integer", "text"]))
+    assert rows == [[struct.pack(">i", 1), b"x"], [None, b"yz"]]
+
+
+def test_supports():
+    assert binary_copy.supports(["integer", "date", "text"])
+    assert not binary_copy.supports(["integer", "jsonb"])
+    assert not binary_copy.supports([None])
+
+
+@pytest.mark.skipif(
+    not os.getenv("OMOP_TEST_DB_URI"), reason="OMOP_TEST_DB_URI not set"
+)
+def test_copy_round_trip_through_postgres():
+    psycopg2 = pytest.importorskip("psycopg2")
+    pg_types = [
+        "smallint",
+        "integer",
+        "bigint",
+        "numeric",
+        "date",
+        "timestamp without time zone",
+        "timestamp with time zone",
+        "text",
+    ]
+    df = pd.DataFrame(
+        {
+            "i2": pd.array([-32768, None], dtype="Int64"),
+            "i4": pd.array([2**31 - 1, None], dtype="Int64"),
+            "i8": pd.array([-(2**63), None], dtype="Int64"),
+            "num": [Decimal("-123.4500"), None],
+            "d": pd.to_datetime(["1999-12-31", None]),
+            "ts": pd.to_datetime(["2024-02-29 12:34:56.789012", None]),
+            "tstz": pd.to_datetime(["2000-01-01T00:00:00Z", None]),
+            "t": ["héllo", None],
+        }
+    )
+    buf = io.BytesIO(
+        binary_copy.COPY_HEADER
+        + binary_copy.encode_rows(df, pg_types)
+        + binary_copy.COPY_TRAILER
+    )
+
+    conn = psycopg2.connect(os.environ["OMOP_TEST_DB_URI"])
+    conn.set_client_encoding("UTF8")
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET TIME ZONE 'UTC'")
+            columns = ", ".join(f"{c} {t}" for c, t in zip(df.columns, pg_types))
+            cur.execute(f"CREATE TEMP TABLE binary_copy_test ({columns})")
+            cur.copy_expert(
+                "COPY binary_copy_test FROM STDIN WITH (FORMAT BINARY)", buf
+            )
+            cur.execute("SELECT * FROM binary_copy_test")
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    assert rows == [
+        (
+            -32768,
+            2**31 - 1,
+            -(2**63),
+            Decimal("-123.4500"),
+            date(1999, 12, 31),
+            datetime(2024, 2, 29, 12, 34, 56, 789012),
+            datetime(2000, 1, 1, tzinfo=timezone.utc),
+            "héllo",
+        ),
+        (None,) * 8,
+    ]
@@ -0,0 +1,72 @@
+"""
+Tests for OMOPETLBase.bulk_load against a real server (OMOP_TEST_DB_URI)
+"""
+
+import os
+
+import pandas as pd
+import pytest
+from sqlalchemy import event, text
+
+from etl_omop_fhir.etl_engine.base_etl import OMOPETLBase
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("OMOP_TEST_DB_URI"), reason="OMOP_TEST_DB_URI not set"
+)
+
+SCHEMA = "bulk_load_test"
+
+
+@pytest.fixture
+def etl():
+    etl = OMOPETLBase(os.environ["OMOP_TEST_DB_URI"])
+    with etl.engine.begin() as conn:
+        conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.exec_driver_sql(f"CREATE SCHEMA {SCHEMA}")
+        conn.exec_driver_sql(f"CREATE TABLE {SCHEMA}.parent (id integer PRIMARY KEY)")
+        conn.exec_driver_sql(
+            f"CREATE TABLE {SCHEMA}.child (id integer PRIMARY KEY, "
+            f"parent_id integer REFERENCES {SCHEMA}.parent)"
+        )
+        conn.exec_driver_sql(f"CREATE INDEX child_parent ON {SCHEMA}.child (parent_id)")
+        conn.exec_driver_sql(f"INSERT INTO {SCHEMA}.parent VALUES (1)")
+    yield etl
+    with etl.engine.begin() as conn:
+        conn.exec_driver_sql(f"DROP SCHEMA {SCHEMA} CASCADE")
+    etl.engine.dispose()
+
+
+def child_rows(etl):
+    with etl.engine.connect() as conn:
+        return conn.execute(text(f"SELECT * FROM {SCHEMA}.child ORDER BY id")).all()
+
+
+def test_bulk_load_commits_valid_rows(etl):
+    with etl.bulk_load(["child"], schema=SCHEMA) as conn:
+        frame = pd.DataFrame({"id": [1, 2], "parent_id": [1, None]})
+        etl.bulk_insert("child", frame, schema=SCHEMA, conn=conn)
+    assert child_rows(etl) == [(1, 1), (2, None)]
+
+
+def test_bulk_load_rejects_orphan_rows(etl):
+    with pytest.raises(ValueError, match="1 rows violate foreign key"):
+        with etl.bulk_load(["child"], schema=SCHEMA) as conn:
+            frame = pd.DataFrame({"id": [1, 2], "parent_id": [1, 0]})
+            etl.bulk_insert("child", frame, schema=SCHEMA, conn=conn)
+    assert child_rows(etl) == []
+
+
+def test_insert_fallback_sends_one_statement_per_batch(etl):
+    statements = []
+
+    def count_inserts(conn, cursor, statement, *args):
+        if statement.startswith("INSERT"):
+            statements.append(statement)
+
+    etl.config["etl"]["batch_size"] = 2
+    event.listen(etl.engine, "before_cursor_execute", count_inserts)
+    # An all-NULL column must still bind as the integer it is stored as
+    frame = pd.DataFrame({"id": range(1, 6), "parent_id": [None] * 5})
+    assert etl._insert_frames("child", [frame], schema=SCHEMA) == 5
+    assert len(statements) == 3
+    assert child_rows(etl) == [(i, None) for i in range(1, 6)]
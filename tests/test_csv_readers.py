@@ -0,0 +1,69 @@
+"""
+Tests for the Synthea CSV readers
+
+The Arrow reader and the pandas fallback must produce the same frames.
+"""
+
+import pandas as pd
+import pytest
+
+from etl_omop_fhir.etl_engine import base_etl
+from etl_omop_fhir.etl_engine.base_etl import OMOPETLBase
+from etl_omop_fhir.etl_engine.synthea_omop_mapper import (
+    COERCE_DATES,
+    PATIENT_COLUMNS,
+    PATIENT_DATES,
+    PATIENT_DTYPES,
+)
+
+PATIENTS_CSV = """\
+Id,BIRTHDATE,DEATHDATE,SSN,RACE,ETHNICITY,GENDER
+a1,1968-02-15,,999,black,hispanic,M
+a2,2006-11-22,2020-01-03,999,white,nonhispanic,F
+a3,1983-11-18,unknown,999,,nonhispanic,
+a4,1990-05-01,,999,asian,hispanic,F
+"""
+
+
+@pytest.fixture
+def etl():
+    return OMOPETLBase("sqlite://")
+
+
+def read_patients(etl, csv_path):
+    return etl.read_csv_to_dataframe(
+        csv_path,
+        usecols=PATIENT_COLUMNS,
+        dtype=PATIENT_DTYPES,
+        parse_dates=PATIENT_DATES,
+        coerce_dates=COERCE_DATES,
+    )
+
+
+def test_arrow_and_pandas_readers_match(monkeypatch, etl, tmp_path):
+    pytest.importorskip("pyarrow")
+    csv_path = tmp_path / "patients.csv"
+    csv_path.write_text(PATIENTS_CSV)
+
+    arrow = read_patients(etl, csv_path)
+    monkeypatch.setattr(base_etl, "pacsv", None)
+    pandas = read_patients(etl, csv_path)
+
+    # Date resolution (ms vs us) and category order may differ; values may not
+    for df in (arrow, pandas):
+        df[PATIENT_DATES] = df[PATIENT_DATES].astype("datetime64[ns]")
+    pd.testing.assert_frame_equal(
+        arrow[PATIENT_COLUMNS], pandas[PATIENT_COLUMNS], check_categorical=False
+    )
+    assert pandas["DEATHDATE"].isna().tolist() == [True, False, True, True]
+
+
+def test_header_only_csv_keeps_date_dtypes(monkeypatch, etl, tmp_path):
+    csv_path = tmp_path / "patients.csv"
+    csv_path.write_text(PATIENTS_CSV.splitlines()[0] + "\n")
+    monkeypatch.setattr(base_etl, "pacsv", None)
+
+    patients = read_patients(etl, csv_path)
+    assert patients.empty
+    for col in PATIENT_DATES:
+        assert pd.api.types.is_datetime64_any_dtype(patients[col])
@@ -0,0 +1,78 @@
+"""
+Tests for the fused mapper kernels
+
+The Numba kernels and their numpy fallbacks must produce identical columns.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl_omop_fhir.etl_engine import kernels
+
+NAT = kernels.NAT
+
+
+@pytest.fixture
+def chunk():
+    """Synthetic event chunk with unknown patients and missing dates"""
+    rng = np.random.default_rng(42)
+    n = 1000
+    start = pd.Series(
+        pd.Timestamp("2000-01-01") + pd.to_timedelta(rng.integers(0, 9000, n), "D")
+    )
+    stop = start + pd.to_timedelta(rng.integers(0, 400, n), "D")
+    stop[rng.random(n) < 0.3] = pd.NaT
+    start[rng.random(n) < 0.05] = pd.NaT
+    patient_idx = rng.integers(-1, 200, n)
+    return patient_idx, kernels.datetime_ns(start), kernels.datetime_ns(stop)
+
+
+def fallback(monkeypatch, func, *args):
+    """Run a kernel wrapper through its numpy fallback"""
+    with monkeypatch.context() as m:
+        m.setattr(kernels, "njit", None)
+        return func(*args)
+
+
+def assert_same_columns(compiled, expected):
+    for got, want in zip(compiled, expected):
+        assert got.dtype == want.dtype
+        np.testing.assert_array_equal(got, want)
+
+
+def test_condition_columns_match_numpy_fallback(monkeypatch, chunk):
+    pytest.importorskip("numba")
+    patient_idx, _, stop_ns = chunk
+    expected = fallback(monkeypatch, kernels.condition_columns, patient_idx, stop_ns)
+    assert_same_columns(kernels.condition_columns(patient_idx, stop_ns), expected)
+
+    person_id, status = expected
+    np.testing.assert_array_equal(person_id, patient_idx + 1)
+    np.testing.assert_array_equal(
+        status,
+        np.where(stop_ns == NAT, kernels.CONDITION_ACTIVE, kernels.CONDITION_RESOLVED),
+    )
+
+
+def test_drug_columns_match_numpy_fallback(monkeypatch, chunk):
+    pytest.importorskip("numba")
+    patient_idx, start_ns, stop_ns = chunk
+    expected = fallback(
+        monkeypatch, kernels.drug_columns, patient_idx, start_ns, stop_ns
+    )
+    compiled = kernels.drug_columns(patient_idx, start_ns, stop_ns)
+    # days_supply is undefined where START is missing
+    valid = start_ns != NAT
+    assert_same_columns(compiled[:2], expected[:2])
+    assert compiled[2].dtype == expected[2].dtype
+    np.testing.assert_array_equal(compiled[2][valid], expected[2][valid])
+
+    _, end_ns, days_supply = expected
+    np.testing.assert_array_equal(end_ns, np.where(stop_ns == NAT, start_ns, stop_ns))
+    assert (days_supply[valid] >= 0).all()
+
+
+def test_datetime_ns_parses_strings_and_drops_timezone():
+    values = pd.Series(["2000-01-01T00:00:00Z", None])
+    assert kernels.datetime_ns(values).tolist() == [946684800 * 10**9, NAT]
@@ -0,0 +1,63 @@
+"""
+Tests for the patients.csv → person mapping
+
+The DuckDB query and the pandas transform must produce the same rows.
+"""
+
+import pandas as pd
+import pytest
+
+from etl_omop_fhir.etl_engine import synthea_omop_mapper
+from etl_omop_fhir.etl_engine.synthea_omop_mapper import SyntheaOMOPMapper
+
+PATIENTS_CSV = """\
+Id,BIRTHDATE,DEATHDATE,SSN,FIRST,RACE,ETHNICITY,GENDER,BIRTHPLACE
+a1,1968-02-15,,999,A,black,hispanic,M,X
+a2,2006-11-22,2020-01-03,999,B,white,nonhispanic,F,X
+a3,1983-11-18,unknown,999,C,native,nonhispanic,M,X
+a4,1990-05-01,,999,D,,hispanic,,X
+"""
+
+
+def map_person(monkeypatch, csv_dir, duckdb):
+    """Run map_person through one implementation, capturing its frames"""
+    mapper = SyntheaOMOPMapper("sqlite://", csv_dir, config_path=None)
+    inserted = {}
+    monkeypatch.setattr(
+        mapper, "bulk_insert", lambda table, df, **kwargs: inserted.update({table: df})
+    )
+    with monkeypatch.context() as m:
+        if duckdb is None:
+            m.setattr(synthea_omop_mapper, "duckdb", None)
+        mapper.map_person()
+    return mapper, inserted["person"]
+
+
+def normalized(df: pd.DataFrame) -> pd.DataFrame:
+    """Compare values only: the two paths differ in dtypes and date resolution"""
+    return df.astype(object).where(df.notna(), None).reset_index(drop=True)
+
+
+def test_duckdb_and_pandas_person_match(monkeypatch, tmp_path):
+    duckdb = pytest.importorskip("duckdb")
+    (tmp_path / "patients.csv").write_text(PATIENTS_CSV)
+
+    pandas_mapper, pandas_person = map_person(monkeypatch, tmp_path, None)
+    duckdb_mapper, duckdb_person = map_person(monkeypatch, tmp_path, duckdb)
+
+    assert list(duckdb_person.columns) == list(pandas_person.columns)
+    pd.testing.assert_frame_equal(normalized(duckdb_person), normalized(pandas_person))
+    assert duckdb_mapper.synthea_ids.tolist() == pandas_mapper.synthea_ids.tolist()
+
+    # map_observation_period reads these; a malformed DEATHDATE is missing
+    columns = ["Id", "BIRTHDATE", "DEATHDATE"]
+    pd.testing.assert_frame_equal(
+        normalized(duckdb_mapper._patients[columns]),
+        normalized(pandas_mapper._patients[columns]),
+    )
+    assert duckdb_mapper._patients["DEATHDATE"].isna().tolist() == [
+        True,
+        False,
+        True,
+        True,
+    ]